@@ -6,9 +6,14 @@ import tensorflow as tf
 
 #################################################################################################
 from utilmy.utilmy import log
-from typing import Tuple, Union, Iterable
+from typing import Tuple, Iterable
 from tensorflow.python.framework.ops import EagerTensor, Tensor
 
+try :
+    import simsimd   #### optional, SIMD cdist for CPU-resident inputs
+except ImportError :
+    simsimd = None
+
 def help():
     """function help
     Args:
@@ -33,11 +38,11 @@ def test_all() -> None:
 def test_tf_cdist() -> None:
     """
     Tests all similarity functions.
+    All trials are zero-padded to the max shape and evaluated in one batched call per metric:
+    zero rows/columns are sliced away before comparing, zero features leave both metrics unchanged.
     """
     from scipy.spatial.distance import cdist
-    from tqdm import tqdm
     from utilmy.deeplearning.keras.util_similarity import tf_cdist
-    import tensorflow as tf
 
     eps                                        = 1e-4
     sim_num                                    = 1000
@@ -47,24 +52,28 @@ def test_tf_cdist() -> None:
     metrics                                    = ['euclidean', 'cosine']
 
     log('tf_cdist test started.')
-    for _ in tqdm(range(sim_num)):
-        for metric in metrics:
-            left_rows_count = np.random.randint(
-                left_rows_count_min, left_rows_count_max, 1
-            )[0]
-            right_rows_count = np.random.randint(
-                right_rows_count_min, right_rows_count_max, 1
-            )[0]
-            dim            = np.random.randint(dim_min, dim_max, 1)[0]
-            left_shape     = (left_rows_count, dim)
-            right_shape    = (right_rows_count, dim)
-            left           = tf.random.uniform(left_shape)
-            right          = tf.random.uniform(right_shape)
-            tf_dist_matrix = tf_cdist(left, right, metric)
-            tf_dist_matrix = tf_dist_matrix.numpy()
-            np_dist_matrix = cdist(left.numpy(), right.numpy(), metric)
+    left_rows_counts  = np.random.randint(left_rows_count_min, left_rows_count_max, sim_num)
+    right_rows_counts = np.random.randint(right_rows_count_min, right_rows_count_max, sim_num)
+    dims              = np.random.randint(dim_min, dim_max, sim_num)
+    lefts             = np.zeros((sim_num, left_rows_count_max, dim_max), dtype=np.float32)
+    rights            = np.zeros((sim_num, right_rows_count_max, dim_max), dtype=np.float32)
+    for i in range(sim_num):
+        lefts[i, :left_rows_counts[i], :dims[i]]  = np.random.uniform(size=(left_rows_counts[i], dims[i]))
+        rights[i, :right_rows_counts[i], :dims[i]] = np.random.uniform(size=(right_rows_counts[i], dims[i]))
+
+    for metric in metrics:
+        tf_dist_matrices = tf_cdist(lefts, rights, metric).numpy()
+        for i in range(sim_num):
+            nl, nr, dim    = left_rows_counts[i], right_rows_counts[i], dims[i]
+            tf_dist_matrix = tf_dist_matrices[i, :nl, :nr]
+            np_dist_matrix = cdist(lefts[i, :nl, :dim], rights[i, :nr, :dim], metric)
             diff           = np.linalg.norm(tf_dist_matrix - np_dist_matrix)
             assert diff < eps, f'Accuracy error occurred. Error value: {diff}'
+
+        #### 2D inputs, CPU path
+        left, right    = lefts[0, :left_rows_counts[0], :dims[0]], rights[0, :right_rows_counts[0], :dims[0]]
+        diff           = np.linalg.norm(tf_cdist(left, right, metric).numpy() - cdist(left, right, metric))
+        assert diff < eps, f'Accuracy error occurred. Error value: {diff}'
     log('tf_cdist test completed successfully.')
 
 
@@ -76,8 +85,13 @@ def tf_cdist(left: Iterable[float], right: Iterable[float], metric: str ='euclid
     """
     Computes `metric` distance between tensors.\n
     Parameters:
-    left, right: tensor or array-like, metric: 'euclidean' or 'cosine'
+    left, right: tensor or array-like, (N,D) and (M,D), or batched (B,N,D) and (B,M,D)
+    metric: 'euclidean' or 'cosine'
     """
+    #### CPU inputs: SimSIMD skips the TF dispatch overhead, GPU tensors stay on the TF path
+    if metric in ('euclidean', 'cosine') and __is_cpu_resident(left) and __is_cpu_resident(right):
+        return __cdist_simsimd(left, right, metric)
+
     #### distance between tensor
     if metric == 'euclidean':
         return tf_cdist_euclidean(left, right)
@@ -94,15 +108,9 @@ def tf_cdist_euclidean(left: Iterable[float], right: Iterable[float]) -> tf.Tens
     Parameters:
     left, right: tensor or array-like
     """
-    left, right                       = __cast_left_and_right_to_tensors(left, right)
-    rows_count_left, rows_count_right = __get_rows_counts(left, right)
-    left_sqr                          = __get_tensor_sqr(left, (-1, 1), (1, rows_count_right))
-    right_sqr                         = __get_tensor_sqr(right, (1, -1), (rows_count_left, 1))
-    left_right_mat_mul                = tf.matmul(left, tf.transpose(right))
-    sqr_sum                           = left_sqr - 2.0 * left_right_mat_mul + right_sqr
-    distance                          = tf.where(sqr_sum > 0.0, tf.sqrt(sqr_sum), 0.0)
-    distance                          = tf.cast(distance, tf.float32)
-    return distance
+    left, right = __cast_left_and_right_to_tensors(left, right)
+    return __get_cdist_graph('euclidean')(left, right)
+
 
 def tf_cdist_cos(left: Iterable[float], right: Iterable[float]) -> tf.Tensor:
     """
@@ -111,49 +119,98 @@ def tf_cdist_cos(left: Iterable[float], right: Iterable[float]) -> tf.Tensor:
     left, right: tensor or array-like
     """
     left, right = __cast_left_and_right_to_tensors(left, right)
-    norm_left   = __get_tensor_reshaped_norm(left, (-1, 1))
-    norm_right  = __get_tensor_reshaped_norm(right, (1, -1))
-    cos         = tf.matmul(left, tf.transpose(right)) / norm_left / norm_right
-    distance    = 1.0 - cos
-    distance    = tf.cast(distance, tf.float32)
+    return __get_cdist_graph('cosine')(left, right)
+
+
+#### One graph per metric, traced once: the unknown-shape signature avoids retracing per input shape.
+#### No XLA jit_compile: it recompiles for every new concrete shape, and needs TF >= 2.5.
+#### Inputs are already float32 (see __cast_left_and_right_to_tensors), so no final cast.
+#### Rank is left open: leading dims are batch dims, (..., N, D) x (..., M, D) -> (..., N, M)
+@tf.function(input_signature=[tf.TensorSpec(None, tf.float32)] * 2)
+def __tf_cdist_euclidean_graph(left: Tensor, right: Tensor) -> Tensor:
+    #### (N,1) and (1,M) norms, broadcast in the sum below: no (N,M) tile
+    left_sqr           = __get_tensor_sqr(left)
+    right_sqr          = __get_tensor_sqr(right, as_row=True)
+    left_right_mat_mul = tf.matmul(left, right, transpose_b=True)
+    sqr_sum            = left_sqr - 2.0 * left_right_mat_mul + right_sqr
+    #### clamp away small negatives from cancellation; 1e-30 also keeps the sqrt gradient finite
+    distance           = tf.sqrt(tf.maximum(sqr_sum, 1e-30))
     return distance
 
 
+@tf.function(input_signature=[tf.TensorSpec(None, tf.float32)] * 2)
+def __tf_cdist_cos_graph(left: Tensor, right: Tensor) -> Tensor:
+    #### normalize rows once (N+M work) instead of dividing the (N,M) product twice
+    unit_left  = tf.math.l2_normalize(left, axis=-1)
+    unit_right = tf.math.l2_normalize(right, axis=-1)
+    distance   = 1.0 - tf.matmul(unit_left, unit_right, transpose_b=True)
+    return distance
+
+
+
+#### metric -> traced concrete function (float32 inputs), reused across calls
+_CDIST_GRAPHS = {}
+
+def __get_cdist_graph(metric: str):
+    """ Trace the cdist kernel once per metric and cache the concrete function.\n
+    Parameters:
+    metric: 'euclidean' or 'cosine'"""
+    if metric not in _CDIST_GRAPHS:
+        kernel = __tf_cdist_euclidean_graph if metric == 'euclidean' else __tf_cdist_cos_graph
+        _CDIST_GRAPHS[metric] = kernel.get_concrete_function()
+    return _CDIST_GRAPHS[metric]
+
+
+def __is_cpu_resident(x) -> bool:
+    """ True if x can be handed to SimSIMD as a 2D host buffer.\n
+    Parameters:
+    x: tensor or array-like"""
+    if simsimd is None:
+        return False
+    if isinstance(x, EagerTensor):
+        return x.device.endswith('CPU:0') and len(x.shape) == 2
+    if isinstance(x, Tensor):   #### symbolic, inside a graph
+        return False
+    return np.ndim(x) == 2
+
+
+def __cdist_simsimd(left: Iterable[float], right: Iterable[float], metric: str) -> EagerTensor:
+    """ Computes `metric` distance with SimSIMD on CPU.\n
+    Parameters:
+    left, right: 2D tensor or array-like, metric: 'euclidean' or 'cosine'"""
+    left  = np.ascontiguousarray(left,  dtype=np.float32)   #### zero-copy for contiguous float32
+    right = np.ascontiguousarray(right, dtype=np.float32)
+    if metric == 'euclidean':
+        distance = np.sqrt(np.asarray(simsimd.cdist(left, right, metric='sqeuclidean')))
+    else:
+        distance = np.asarray(simsimd.cdist(left, right, metric='cosine'))
+    return tf.convert_to_tensor(distance, dtype=tf.float32)
+
 
 def __cast_left_and_right_to_tensors(left: EagerTensor, right: EagerTensor) -> Tuple[EagerTensor, EagerTensor]:
     """Cast left, right into tensors.\n
     Parameters:
     left, right: tensor or array-like"""
-    left  = tf.cast(tf.convert_to_tensor(left), dtype=tf.float32)
-    right = tf.cast(tf.convert_to_tensor(right), dtype=tf.float32)
+    left  = __as_f32(left)
+    right = __as_f32(right)
     return left, right
 
 
-def __get_rows_counts(left: EagerTensor, right: EagerTensor) -> Tuple[EagerTensor, EagerTensor]:
-    """ Count rows for left, right.\n
+def __as_f32(x) -> Tensor:
+    """ Convert x to a float32 tensor, returned as is if it already is one.\n
     Parameters:
-    left, right: tensor"""
-    count_left  = tf.shape(left)[0]
-    count_right = tf.shape(right)[0]
-    return count_left, count_right
+    x: tensor or array-like"""
+    if isinstance(x, Tensor) and x.dtype == tf.float32:
+        return x
+    return tf.cast(tf.convert_to_tensor(x), dtype=tf.float32)
 
 
-def __get_tensor_sqr(tensor: EagerTensor, reshape_shape: Tuple[int, int],
-                     tile_shape: Union[Tuple[EagerTensor, int], Tuple[int, EagerTensor]]) -> EagerTensor:
-    """ Calculate the element-wise square of a tensor.\n
+def __get_tensor_sqr(tensor: EagerTensor, as_row: bool = False) -> EagerTensor:
+    """ Calculate the row-wise squared norm of a tensor, shaped for broadcasting.\n
     Parameters:
-    left, right: tensor"""
-    sqr = tf.pow(tensor, 2.0)
-    sqr = tf.reduce_sum(sqr, axis=1)
-    sqr = tf.reshape(sqr, reshape_shape)
-    sqr = tf.tile(sqr, tile_shape)
+    tensor: (..., N, D), as_row: False gives (..., N, 1), True gives (..., 1, N)"""
+    sqr = tf.math.square(tensor)   #### plain multiply, not the generic pow kernel
+    sqr = tf.reduce_sum(sqr, axis=-1, keepdims=True)
+    if as_row:
+        sqr = tf.linalg.matrix_transpose(sqr)
     return sqr
-
-
-def __get_tensor_reshaped_norm(tensor: EagerTensor, reshape_shape: Tuple[int, int]) -> EagerTensor:
-    """ Normalize and reshape the tensor.\n
-    Parameters:
-    tensor, reshape_shape: int"""
-    norm = tf.norm(tensor, axis=1)
-    norm = tf.reshape(norm, reshape_shape)
-    return norm
\ No newline at end of file
@@ -967,9 +967,12 @@ class vizEmbedding:
         self.cluster_names = {i: f'Cluster {i}' for i in range(self.num_clusters)}
         
         
-    def create_visualization(self, dir_out="ztmp/", mode='d3', cols_label=None, show_server=False,  **kw ):
+    def create_visualization(self, dir_out="ztmp/", mode='d3', cols_label=None, show_server=False,
+                             save_img=True, show_labels=False, max_labels=200, **kw ):
         """
-
+            save_img:     also save a static png of the figure
+            show_labels:  write each point title on the png (one text per point, slow on large data)
+            max_labels:   no point titles on the png above this number of points (hover tooltip only)
         """
         os.makedirs(dir_out, exist_ok=True)
         cols_label          = [] if cols_label is None else cols_label 
@@ -988,66 +991,42 @@ class vizEmbedding:
         df.to_parquet(f"{dir_out}/embs_xy_cluster.parquet")
 
 
-        # group by cluster
-        groups_clusters = df.groupby('clusters')
-
-        # set up plot
-        fig, ax = plt.subplots(figsize=(25, 15))  # set size
-        ax.margins(0.05)  # Optional, just adds 5% padding to the autoscaling
-
-        # iterate through groups to layer the plot
-        # note that I use the cluster_name and cluster_color dicts with the 'name' lookup to return
-        # the appropriate color/label
-        for name, group in groups_clusters:
-            ax.plot(group.x, group.y, marker='o', linestyle='', ms=12, label= self.cluster_names[name],
-                    color=self.cluster_color[name],
-                    mec='none')
-            ax.set_aspect('auto')
-            ax.tick_params(axis='x',  # changes apply to the x-axis
-                           which='both',  # both major and minor ticks are affected
-                           bottom='off',  # ticks along the bottom edge are off
-                           top='off',  # ticks along the top edge are off
-                           labelbottom='off')
-            ax.tick_params(axis='y',  # changes apply to the y-axis
-                           which='both',  # both major and minor ticks are affected
-                           left='off',  # ticks along the bottom edge are off
-                           top='off',  # ticks along the top edge are off
-                           labelleft='off')
-
-        ax.legend(numpoints=1)  # show legend with only 1 point
-
-        # add label in x,y position with the label as the
-        for i in range(len(df)):
-            ax.text(df.loc[i]['x'], df.loc[i]['y'], df.loc[i]['title'], size=8)
-
-        # uncomment the below to save the plot if need be
-        plt.savefig(f'{dir_out}/clusters_static-{datetime.now().strftime("%Y-%m-%d %H-%M-%S")}.png', dpi=200)
-
         # Plot
         fig, ax = plt.subplots(figsize=(20, 15))  # set plot size
         ax.margins(0.03)  # Optional, just adds 5% padding to the autoscaling
 
-        # iterate through groups to layer the plot
-        for name, group in groups_clusters:
-            points = ax.plot(group.x, group.y, marker='o', linestyle='', ms=7, label= self.cluster_names[name], mec='none',
-                             color=self.cluster_color[name])
-            ax.set_aspect('auto')
-            labels = [i for i in group.title]
+        # all clusters in a single scatter, color per point from its cluster: one tooltip plugin for all points
+        xs, ys, titles = df['x'].to_numpy(), df['y'].to_numpy(), df['title'].to_numpy()
+        colors = np.asarray(self.cluster_color)[df['clusters'].to_numpy()]
+        points = ax.scatter(xs, ys, s=7**2, c=colors, marker='o', linewidths=0)
+        ax.set_aspect('auto')
 
-            # set tooltip using points, labels and the already defined 'css'
-            tooltip = mpld3.plugins.PointHTMLTooltip(points[0], labels, voffset=10, hoffset=10, css=CSS)
-            # connect tooltip to fig
-            mpld3.plugins.connect(fig, tooltip, TopToolbar())
+        # set tooltip using points, labels and the already defined 'css'
+        tooltip = mpld3.plugins.PointHTMLTooltip(points, list(titles), voffset=10, hoffset=10, css=CSS)
+        # connect tooltip to fig
+        mpld3.plugins.connect(fig, tooltip, TopToolbar())
 
-            # set tick marks as blank
-            ax.axes.get_xaxis().set_ticks([])
-            ax.axes.get_yaxis().set_ticks([])
+        # set tick marks as blank
+        ax.axes.get_xaxis().set_ticks([])
+        ax.axes.get_yaxis().set_ticks([])
 
-            # set axis as blank
-            ax.axes.get_xaxis().set_visible(False)
-            ax.axes.get_yaxis().set_visible(False)
+        # set axis as blank
+        ax.axes.get_xaxis().set_visible(False)
+        ax.axes.get_yaxis().set_visible(False)
 
-        ax.legend(numpoints=1)  # show legend with only one dot
+        # legend: one proxy marker per cluster
+        from matplotlib.lines import Line2D
+        handles = [ Line2D([], [], marker='o', linestyle='', ms=7, mec='none', color=self.cluster_color[name],
+                           label=self.cluster_names[name]) for name in np.unique(df['clusters'].to_numpy()) ]
+        ax.legend(handles=handles, numpoints=1)  # show legend with only one dot
+
+        ##### Static PNG from the same figure, point labels only there (not in the html)
+        if save_img :
+            texts = []
+            if show_labels and len(df) <= max_labels :
+                texts = [ ax.text(x, y, t, size=8) for x, y, t in zip(xs, ys, titles) ]
+            plt.savefig(f'{dir_out}/clusters_static-{datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")}.png', dpi=200)
+            for t in texts : t.remove()
 
 
         ##### Export ############################################################
@@ -1055,12 +1034,16 @@ class vizEmbedding:
         log('Visualization',    f"{dir_out}/embeds.html" )
 
         ### Windows specifc
-        if os.name == 'nt': os.system(f'start chrome "{dir_out}/embeds.html" ')
+        if os.name == 'nt':
+            import webbrowser
+            webbrowser.open_new_tab(Path(os.path.abspath(f"{dir_out}/embeds.html")).as_uri())
 
 
         if show_server :
            # mpld3.show(fig=None, ip='127.0.0.1', port=8888, n_retries=50, local=True, open_browser=True, http_server=None, **kwargs)[source] 
-           mpld3.show()  # show the plot
+           mpld3.show(fig)  # show the plot
+
+        plt.close(fig)   #### pyplot keeps every figure alive until closed
 
 
 
@@ -1068,7 +1051,7 @@ class vizEmbedding:
         linkage_matrix = ward(self.dist)  # define the linkage_matrix using ward clustering pre-computed distances
         fig, ax = plt.subplots(figsize=(15, 20))  # set size
         ax = dendrogram(linkage_matrix, orientation="right", labels=self.text_labels)
-        plt.tick_params(axis='x', which='both', bottom='off', top='off', labelbottom='off')
+        plt.tick_params(axis='x', which='both', bottom=False, top=False, labelbottom=False)
         plt.tight_layout()
         plt.savefig('dendogram_clusters.png', dpi=200)
 
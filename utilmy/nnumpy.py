@@ -223,7 +223,8 @@ def np_list_intersection(l1, l2) :
   Returns:
       
   """
-  return [x for x in l1 if x in l2]
+  s2 = set(l2)   #### O(1) lookup, keeps l1 order
+  return [x for x in l1 if x in s2]
 
 
 def np_add_remove(set_, to_remove, to_add):
@@ -236,11 +237,7 @@ def np_add_remove(set_, to_remove, to_add):
         
     """
     # a function that removes list of elements and adds an element from a set
-    result_temp = set_.copy()
-    for element in to_remove:
-        result_temp.remove(element)
-    result_temp.add(to_add)
-    return result_temp
+    return (set(set_) - set(to_remove)) | {to_add}
 
 
 def to_float(x, valdef=-1):
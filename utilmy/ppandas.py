@@ -3,7 +3,7 @@ HELP= """
 
 
 """
-import os, sys, time, datetime,inspect, json, yaml, gc, glob, pandas as pd, numpy as np
+import os, sys, time, datetime,inspect, json, yaml, gc, glob, functools, pandas as pd, numpy as np
 
 from utilmy.parallel import pd_read_file, pd_read_file2
 
@@ -73,6 +73,20 @@ def test2():
     l = np_add_remove(set(l1),[1,2],4)
     assert l == set([3,4]), "Add remove failed"
 
+    #### vectorized versions: pd.to_numeric semantics, see the note above to_float_series
+    nan, inf = float("nan"), float("inf")
+    same = lambda a, b: all( x == y or (x != x and y != y) for x, y in zip(a, b) ) and len(a) == len(b)
+    s = pd.Series(["1", "2.5", "a", 3, 2.5, None, " 7 ", nan, True, "inf"])
+    assert same(list(to_float_series(s)), [1, 2.5, nan, 3, 2.5, nan, 7, nan, 1, inf]), "to_float_series failed"
+    assert same(list(to_int_series(s)),   [1, 2,   nan, 3, 2,   nan, 7, nan, 1, nan]), "to_int_series failed"
+    assert list(is_int_series(s))   == [True, False, False, True, False, False, True, False, True, False], "is_int_series failed"
+    assert list(is_float_series(s)) == [True, True,  False, True, True,  False, True, False, True, True],  "is_float_series failed"
+    for s in [ pd.Series([1.0, 2.5, -2.5, np.nan, np.inf]),  pd.Series([1, 2, 3]) ] :
+        assert same(list(to_float_series(s)), [to_float(x) for x in s]), "to_float_series failed"
+        assert same(list(to_int_series(s)),   [to_int(x)   for x in s]), "to_int_series failed"
+        assert list(is_int_series(s))   == [is_int(x) and x % 1 == 0 for x in s], "is_int_series failed"
+        assert list(is_float_series(s)) == [is_float(x) and x == x   for x in s], "is_float_series failed"
+
     to_timeunix(datex="2018-01-16")
     to_timeunix(datetime.datetime(2018,1,16))
     to_datetime("2018-01-16")
@@ -189,9 +203,70 @@ def pd_merge(df1, df2, on=None, colkeep=None):
   Returns:
       
   """
-  ### Faster merge
-  cols = list(df2.columns) if colkeep is None else on + colkeep
-  return df1.join( df2[ cols   ].set_index(on), on=on, how='left', rsuffix="2")
+  ### Faster merge: direct hash join, no index built on df2
+  df2 = df2 if colkeep is None else df2[ on + colkeep ]
+  #### df1 index carried through the merge as columns: kept (repeated on duplicate keys), as join did
+  colsidx = [ f'__index_{i}' for i in range(df1.index.nlevels) ]
+  dfm = df1.rename_axis(colsidx).reset_index().merge(df2, on=on, how='left', sort=False, suffixes=('', '2'))
+  dfm = dfm.set_index(colsidx).rename_axis(df1.index.names)
+  return dfm
+
+
+@functools.lru_cache(maxsize=32)
+def _colors(n:int):
+    """ Default pandas color cycle of size n, resolved and computed once per n.
+    """
+    from pandas.plotting._matplotlib import style
+    fun = getattr(style, 'get_standard_colors', None) or style._get_standard_colors
+    return tuple(fun(num_colors=n))
+
+
+#### pandas .plot() arguments which are axes level: applied on the axes, not passed to Axes.plot
+_PD_PLOT_AXES_KW = ('title', 'grid', 'legend', 'logx', 'logy', 'loglog', 'xlim', 'ylim', 'rot', 'fontsize',
+                    'xlabel', 'ylabel', 'style')
+
+def _plot_kw_split(kw:dict, drop:tuple=()):
+    """ pandas .plot() kwargs -> (Axes.plot line kwargs, axes level kwargs), keys in drop are discarded.
+    """
+    axkw   = { k: v for k, v in kw.items() if k in _PD_PLOT_AXES_KW }
+    linekw = { k: v for k, v in kw.items() if k not in _PD_PLOT_AXES_KW and k not in drop }
+    return linekw, axkw
+
+
+def _plot_axes_apply(axes:list, axkw:dict):
+    """ Apply axes level pandas .plot() kwargs, axes[0] is the main axis (title, x axis, grid).
+    """
+    ax = axes[0]
+    if 'title'  in axkw :              ax.set_title(axkw['title'])
+    if 'xlabel' in axkw :              ax.set_xlabel(axkw['xlabel'])
+    if axkw.get('grid') is not None :  ax.grid(bool(axkw['grid']))
+    if 'rot'    in axkw :              ax.tick_params(axis='x', labelrotation=axkw['rot'])
+    for axi in axes :
+        if axkw.get('logx') or axkw.get('loglog') : axi.set_xscale('log')
+        if axkw.get('logy') or axkw.get('loglog') : axi.set_yscale('log')
+        if 'xlim'     in axkw : axi.set_xlim(axkw['xlim'])
+        if 'ylim'     in axkw : axi.set_ylim(axkw['ylim'])
+        if 'fontsize' in axkw : axi.tick_params(labelsize=axkw['fontsize'])
+
+
+def _plot_fast_ok(index, linekw:dict)-> bool:
+    """ True if Axes.plot on numpy arrays draws what pandas .plot() would: plain numeric / datetime64 index,
+    and only Line2D properties in linekw. MultiIndex, PeriodIndex, kind=... keep pandas own .plot().
+    """
+    from matplotlib.lines import Line2D
+    if isinstance(index, pd.MultiIndex) : return False
+    if not (pd.api.types.is_numeric_dtype(index.dtype) or pd.api.types.is_datetime64_dtype(index.dtype)) : return False
+    return all( hasattr(Line2D, 'set_' + k) for k in linekw )
+
+
+def _plot_series(ax, df, col:str, color, fast:bool, linekw:dict, axkw:dict):
+    """ Plot df[col] on ax: Axes.plot on numpy arrays if fast, else pandas Series.plot with all the kwargs.
+    """
+    if fast :
+        style = (axkw['style'],) if axkw.get('style') else ()
+        ax.plot(df.index.to_numpy(), df[col].to_numpy(), *style, label=col, color=color, **linekw)
+    else :
+        df[col].plot(ax=ax, label=col, color=color, **linekw, **axkw)
 
 
 def pd_plot_multi(df, plot_type=None, cols_axe1:list=[], cols_axe2:list=[],figsize=(8,4), spacing=0.1, **kwargs):
@@ -206,8 +281,6 @@ def pd_plot_multi(df, plot_type=None, cols_axe1:list=[], cols_axe2:list=[],figsi
     Returns:
         
     """
-    from pandas import plotting
-    from pandas.plotting import _matplotlib
     from matplotlib import pyplot as plt
 
 
@@ -216,8 +289,7 @@ def pd_plot_multi(df, plot_type=None, cols_axe1:list=[], cols_axe2:list=[],figsi
     if cols_axe1 is None: cols_axe1 = df.columns
     if len(cols_axe1) == 0: return
     
-    # _get_standard_colors is not an attribute of _matplotlib this code might require some changes
-    colors = getattr(getattr(plotting, '_matplotlib').style, '_get_standard_colors')(num_colors=len(cols_axe1 + cols_axe2))
+    colors = _colors(len(cols_axe1) + len(cols_axe2))
     
     # Displays subplot's pair in case of plot_type defined as `pair`
     if plot_type=='pair':
@@ -226,31 +298,36 @@ def pd_plot_multi(df, plot_type=None, cols_axe1:list=[], cols_axe2:list=[],figsi
         return
     
     # First axis
-    ax = df.loc[:, cols_axe1[0]].plot(label=cols_axe1[0], color=colors[0], **kwargs)
+    linekw, axkw = _plot_kw_split(kwargs)   #### pandas .plot() arguments: line ones to Axes.plot, others on the axes
+    fast   = _plot_fast_ok(df.index, linekw)
+    ax     = plt.gca()
+    _plot_series(ax, df, cols_axe1[0], colors[0], fast, linekw, axkw)
     ax.set_ylabel(ylabel=cols_axe1[0])
-    ##  lines, labels = ax.get_legend_handles_labels()
-    lines, labels = [], []
 
     i1 = len(cols_axe1)
     for n in range(1, len(cols_axe1)):
-        df.loc[:, cols_axe1[n]].plot(ax=ax, label=cols_axe1[n], color=colors[(n) % len(colors)], **kwargs)
-        line, label = ax.get_legend_handles_labels()
-        lines  += line
-        labels += label
-
-    for n in range(0, len(cols_axe2)):
-        ######### Multiple y-axes
-        ax_new = ax.twinx()
+        _plot_series(ax, df, cols_axe1[n], colors[(n) % len(colors)], fast, linekw, axkw)
+
+    ######### Multiple y-axes: all created and positioned first, then filled
+    twins = [ax.twinx() for _ in cols_axe2]
+    for n, ax_new in enumerate(twins):
         ax_new.spines['right'].set_position(('axes', 1 + spacing * (n - 1)))
-        df.loc[:, cols_axe2[n]].plot(ax=ax_new, label=cols_axe2[n], color=colors[(i1 + n) % len(colors)], **kwargs)
+
+    for n, ax_new in enumerate(twins):
+        _plot_series(ax_new, df, cols_axe2[n], colors[(i1 + n) % len(colors)], fast, linekw, axkw)
         ax_new.set_ylabel(ylabel=cols_axe2[n])
 
-        ######### Proper legend position
-        line, label = ax_new.get_legend_handles_labels()
-        lines += line
-        labels += label
+    if fast : _plot_axes_apply([ax] + twins, axkw)   #### pandas .plot() already applied them otherwise
+
+    ######### Proper legend position: collect handles once, after all plots
+    lines, labels = [], []
+    for axi in [ax] + twins:
+        line, label = axi.get_legend_handles_labels()
+        lines.extend(line)
+        labels.extend(label)
 
-    ax.legend(lines, labels, loc=0)
+    if axkw.get('legend', True) is not False :
+        ax.legend(lines, labels, loc=0)
     plt.show()
     return ax
 
@@ -272,13 +349,14 @@ def pd_plot_histogram(dfi, path_save=None, nbin=20.0, q5=0.005, q95=0.995, nsamp
     ### Plot histogram
     from matplotlib import pyplot as plt
     import numpy as np, os, time
-    q0 = dfi.quantile(q5)
-    q1 = dfi.quantile(q95)
-
-    if nsample < 0 :
-        dfi.hist( bins=np.arange( q0, q1,  (  q1 - q0 ) /nbin  ) )
-    else :
-        dfi.sample(n=nsample, replace=True ).hist( bins=np.arange( q0, q1,  (  q1 - q0 ) /nbin  ) )
+    arr    = dfi.dropna().to_numpy(dtype=float)
+    q0, q1 = np.percentile(arr, [q5 * 100, q95 * 100])
+    bins   = np.linspace(q0, q1, int(nbin) + 1)
+
+    if nsample > 0 :
+        arr = np.random.default_rng().choice(arr, size=nsample, replace=True)
+    plt.hist(arr, bins=bins)
+    plt.grid(True)
     plt.title( path_save.split("/")[-1] )
 
     if show :
@@ -307,28 +385,30 @@ def pd_filter(df, filter_dict="shop_id=11, l1_genre_id>600, l2_genre_id<80311,"
 
     # pd_filter(df,  ss="shop_id=11, l1_genre_id>600, l2_genre_id<80311," )
     ss = filter_dict.split(",")
+    dtypes = { col: str(dtype) for col, dtype in df.dtypes.items() }   #### once, not per clause
+    ops    = ( ("=", "=="), (">", ">"), ("<", "<") )
     def x_convert(col, x):
-      x_type = str( dict(df.dtypes)[col] )
+      x_type = dtypes[col]
       if "int" in x_type or "float" in x_type :
          return float(x)
       else :
           return x
+    #### All clauses in one query expression: single pass, no intermediate copy per clause
+    #### values go through local_dict (@vi), so strings need no quoting
+    exprs, values = [], {}
     for x in ss :
        x = x.strip()
        if verbose : print(x)
        if len(x) < 3 : continue
-       if "=" in x :
-           coli= x.split("=")
-           df = df[ df[coli[0]] == x_convert(coli[0] , coli[1] )   ]
+       for op, op_query in ops :
+           if op in x :
+               coli = x.split(op)
+               vi   = f"v{len(values)}"
+               values[vi] = x_convert(coli[0] , coli[1] )
+               exprs.append( f"`{coli[0]}` {op_query} @{vi}" )
 
-       if ">" in x :
-           coli= x.split(">")
-           df = df[ df[coli[0]] > x_convert(coli[0] , coli[1] )   ]
-
-       if "<" in x :
-           coli= x.split("<")
-           df = df[ df[coli[0]] < x_convert(coli[0] , coli[1] )   ]
-    return df
+    if len(exprs) < 1 : return df
+    return df.query(" and ".join(exprs), local_dict=values)
 
 
 def pd_to_file(df, filei,  check=0, verbose=True, show='shape',   **kw):
@@ -348,12 +428,16 @@ def pd_to_file(df, filei,  check=0, verbose=True, show='shape',   **kw):
   parent = Path(filei).parent
   os.makedirs(parent, exist_ok=True)
   ext  = os.path.splitext(filei)[1]
+  #### parquet defaults: pyarrow, zstd level 3, dictionary encoding, all overridable by **kw
+  kw_parquet = {'engine': 'pyarrow', 'compression': 'zstd', **kw}
+  if kw_parquet['engine'] == 'pyarrow' :   #### pyarrow only options, fastparquet rejects them
+      kw_parquet = {'compression_level': 3, 'use_dictionary': True, **kw_parquet}
   if   ext == ".pkl" :       df.to_pickle(filei,  **kw)
-  elif ext == ".parquet" :   df.to_parquet(filei, **kw)
+  elif ext == ".parquet" :   df.to_parquet(filei, **kw_parquet)
   elif ext in [".csv" ,".txt"] :  df.to_csv(filei, **kw)        
   else :
       log('No Extension, using parquet')
-      df.to_parquet(filei + ".parquet", **kw)
+      df.to_parquet(filei + ".parquet", **kw_parquet)
 
   if verbose in [True, 1] :  log(filei)        
   if show == 'shape':        log(df.shape)
@@ -381,9 +465,10 @@ def pd_sample_strat(df, col, n):
   """
   ### Stratified sampling
   # n   = min(n, df[col].value_counts().min())
-  df_ = df.groupby(col).apply(lambda x: x.sample(n = n, replace=True))
-  df_.index = df_.index.droplevel(0)
-  return df_
+  #### Draw n row positions per group (with replacement), then a single iloc gather
+  idx_map = df.groupby(col).indices
+  picks   = np.concatenate([ idx[ np.random.randint(0, len(idx), n) ] for idx in idx_map.values() ])
+  return df.iloc[picks]
 
 
 def pd_cartesian(df1, df2) :
@@ -395,17 +480,8 @@ def pd_cartesian(df1, df2) :
       
   """
   ### Cartesian preoduct
-  import pandas as pd
-  col1 =  list(df1.columns)
-  col2 =  list(df2.columns)
-  df1['xxx'] = 1
-  df2['xxx'] = 1
-  df3 = pd.merge(df1, df2,on='xxx')[ col1 + col2 ]
-  try:
-        del df3['xxx']
-  except:pass
-
-  return df3
+  #### pandas>=1.2: no dummy key column, inputs are not modified
+  return df1.merge(df2, how='cross')
 
 
 def pd_col_bins(df, col, nbins=5):
@@ -428,11 +504,11 @@ def pd_dtype_reduce(dfm, int0 ='int32', float0 = 'float32') :
 
 
     """
-    import numpy as np
-    for c in dfm.columns :
-        if dfm[c].dtype ==  np.dtype(np.int32) :       dfm[c] = dfm[c].astype( int0 )
-        elif   dfm[c].dtype ==  np.dtype(np.int64) :   dfm[c] = dfm[c].astype( int0 )
-        elif dfm[c].dtype ==  np.dtype(np.float64) :   dfm[c] = dfm[c].astype( float0 )
+    #### One cast per dtype group instead of one per column
+    cols_int   = dfm.select_dtypes(include=['int32', 'int64']).columns
+    cols_float = dfm.select_dtypes(include=['float64']).columns
+    if len(cols_int)   > 0 :  dfm[cols_int]   = dfm[cols_int].astype( int0 )
+    if len(cols_float) > 0 :  dfm[cols_float] = dfm[cols_float].astype( float0 )
     return dfm
 
 
@@ -448,33 +524,39 @@ def pd_dtype_count_unique(df, col_continuous=[]):
         ncat:  number of categories of each variable. -1 if the variable is  continuous.
     """
     import numpy as np
-    def gef_is_continuous(data, dtype):
-        """ Returns true if data was sampled from a continuous variables, and false
-        """
-        if str(dtype) == "object":
-            return False
-
-        observed = data[~np.isnan(data)]  # not consider missing values for this.
-        rules = [np.min(observed) < 0,
-                 np.sum((observed) != np.round(observed)) > 0,
-                 len(np.unique(observed)) > min(30, len(observed)/3)]
-        if any(rules):
-            return True
-        else:
-            return False
+    #### Continuity rules on a (nsample, ncols) float array, NaN are missing values:
+    ####   min < 0,  any non integer value,  nunique > min(30, n_observed/3)
+    cols_num = list(df.select_dtypes(include='number').columns)   #### others (object, ...) are not continuous
+    x        = df[cols_num].sample( n=min(3000, len(df)) ).to_numpy(dtype=np.float64, na_value=np.nan)  #### pd.NA in Int64
+    is_cont  = dict(zip(cols_num, pd_cols_is_continuous(x) )) if len(cols_num) > 0 else {}
 
     cols = list(df.columns)
     ncat = {}
-
     for coli in cols:
-        is_cont = gef_is_continuous( df[coli].sample( n=min(3000, len(df)) ).values , dtype = df[coli].dtype )
-        if coli in col_continuous or is_cont:
+        if coli in col_continuous or is_cont.get(coli, False):
             ncat[coli] =  -1
         else:
             ncat[coli] =  len( df[coli].unique() )
     return ncat
 
 
+def pd_cols_is_continuous(x):
+    """ Column-wise continuity check, vectorized numpy.
+    Args:
+        x: 2D float64 array (nrows, ncols), NaN are missing values
+    Returns:
+        bool array (ncols,)
+    """
+    import numpy as np
+    isobs   = ~np.isnan(x)
+    nobs    = isobs.sum(axis=0)
+    xmin    = np.where(isobs, x, np.inf).min(axis=0, initial=np.inf)
+    nonint  = (isobs & (x != np.floor(x))).any(axis=0)
+    xs      = np.sort(x, axis=0)   #### NaN sorted last
+    nunique = np.minimum(nobs, 1) + ((xs[1:] != xs[:-1]) & ~np.isnan(xs[1:])).sum(axis=0)
+    return (nobs > 0) & ((xmin < 0) | nonint | (nunique > np.minimum(30, nobs / 3)))
+
+
 def pd_dtype_to_category(df, col_exclude, treshold=0.5):
   """
     Convert string to category
@@ -505,12 +587,12 @@ def pd_dtype_getcontinuous(df, cols_exclude:list=[], nsample=-1) :
     """
     ### Return continuous variable
     clist = {}
+    #### sample once for all columns, NaN counted, as unique() does
+    df_s     = df if nsample == -1 else df.sample(n= nsample, replace=True)
+    nuniques = df_s.nunique(dropna=False)
     for ci in df.columns :
         ctype   = df[ci].dtype
-        if nsample == -1 :
-            nunique = len(df[ci].unique())
-        else :
-            nunique = len(df.sample(n= nsample, replace=True)[ci].unique())
+        nunique = nuniques[ci]
         if 'float' in  str(ctype) and ci not in cols_exclude and nunique > 5 :
            clist[ci] = 1
         else :
@@ -543,16 +625,17 @@ def pd_add_noise(df, level=0.05, cols_exclude:list=[]) :
     Returns:
         
     """
-    import numpy as np, pandas as pd
-    df2 = pd.DataFrame()
+    import numpy as np
+    df2 = df.copy()
     colsnum = pd_dtype_getcontinuous(df, cols_exclude)
-    for ci in df.columns :
-        if ci in colsnum :
-           print(f'adding noise {ci}')
-           sigma = level * (df[ci].quantile(0.95) - df[ci].quantile(0.05)  )
-           df2[ci] = df[ci] + np.random.normal(0.0, sigma, [len(df)])
-        else :
-           df2[ci] = df[ci]
+    cols    = [ci for ci in df.columns if ci in colsnum ]
+    if len(cols) < 1 : return df2
+
+    print(f'adding noise {cols}')
+    #### One quantile pass and one RNG draw for all columns, sigma broadcast per column
+    q       = df[cols].quantile([0.05, 0.95]).values
+    sigma   = level * (q[1] - q[0])
+    df2[cols] = df[cols].values + np.random.normal(0.0, sigma, (len(df), len(cols)))
     return df2
 
 
@@ -567,12 +650,12 @@ def pd_cols_unique_count(df, cols_exclude:list=[], nsample=-1) :
     """
     ### Return cadinat=lity
     clist = {}
+    #### sample once for all columns, NaN counted, as unique() does
+    df_s     = df if nsample == -1 else df.sample(n= nsample, replace=True)
+    nuniques = df_s.nunique(dropna=False)
     for ci in df.columns :
         ctype   = df[ci].dtype
-        if nsample == -1 :
-            nunique = len(df[ci].unique())
-        else :
-            nunique = len(df.sample(n= nsample, replace=True)[ci].unique())
+        nunique = nuniques[ci]
 
         if 'float' in  str(ctype) and ci not in cols_exclude and nunique > 5 :
            clist[ci] = 0
@@ -653,7 +736,8 @@ def np_list_intersection(l1, l2) :
   Returns:
       
   """
-  return [x for x in l1 if x in l2]
+  s2 = set(l2)   #### O(1) lookup, keeps l1 order
+  return [x for x in l1 if x in s2]
 
 
 def np_add_remove(set_, to_remove, to_add):
@@ -666,11 +750,7 @@ def np_add_remove(set_, to_remove, to_add):
         
     """
     # a function that removes list of elements and adds an element from a set
-    result_temp = set_.copy()
-    for element in to_remove:
-        result_temp.remove(element)
-    result_temp.add(to_add)
-    return result_temp
+    return (set(set_) - set(to_remove)) | {to_add}
 
 
 def to_float(x):
@@ -679,6 +759,7 @@ def to_float(x):
         x:   
     Returns:
         
+    Scalar version, for Series use to_float_series (vectorized).
     """
     try :
         return float(x)
@@ -692,6 +773,7 @@ def to_int(x):
         x:   
     Returns:
         
+    Scalar version, for Series use to_int_series (vectorized).
     """
     try :
         return int(x)
@@ -705,6 +787,7 @@ def is_int(x):
         x:   
     Returns:
         
+    Scalar version, for Series use is_int_series (vectorized).
     """
     try :
         int(x)
@@ -718,14 +801,76 @@ def is_float(x):
         x:   
     Returns:
         
+    Scalar version, for Series use is_float_series (vectorized).
     """
     try :
         float(x)
         return True
     except :
-        return False   
+        return False
+
+
+#### Vectorized counterparts of to_float / to_int / is_int / is_float, prefer them in hot code:
+#### one pd.to_numeric(errors='coerce') C pass, no per element try/except. They follow pandas parsing,
+#### so they differ from the scalar helpers on a few inputs:
+####   - strings float() accepts but pandas does not ('1_000') are invalid: NaN / False
+####   - missing values (None, NaN, 'nan') are not float: is_float_series False, where is_float(nan) is True
+####   - is_int_series is True on finite integral values only: False on 2.5 / '2.5', True on '3.0' / '1e3'
+####   - to_int_series truncates any finite number, also strings int() rejects ('2.5', '1e3')
+def _to_numeric_series(s):
+    """ (pd.Series, its values as float64 numpy array), invalid values -> NaN
+    """
+    s = pd.Series(s)
+    v = pd.to_numeric(s, errors='coerce')
+    return v, v.to_numpy(dtype='float64', na_value=np.nan)
+
+
+def to_float_series(s, dtype='float64'):
+    """ Vectorized to_float: pd.to_numeric, invalid values -> NaN
+    Args:
+        s:      pd.Series or array-like
+        dtype:  output float dtype, 'float32' to halve memory
+    Returns:
+        pd.Series
+    """
+    v, _ = _to_numeric_series(s)
+    return v.astype(dtype)
+
+
+def to_int_series(s):
+    """ Vectorized to_int: finite numbers truncated, invalid values -> NaN
+    Args:
+        s:   pd.Series or array-like
+    Returns:
+        pd.Series (int64, float64 once a NaN is present)
+    """
+    v, f = _to_numeric_series(s)
+    if isinstance(v.dtype, np.dtype) and v.dtype.kind in 'iub' :  return v.astype('int64')
+    return pd.Series(np.where(np.isfinite(f), np.trunc(f), np.nan), index=v.index)
 
 
+def is_int_series(s):
+    """ Vectorized is_int: True where the value is a finite integral number
+    Args:
+        s:   pd.Series or array-like
+    Returns:
+        pd.Series of bool
+    """
+    v, f = _to_numeric_series(s)
+    with np.errstate(invalid='ignore') :
+        return pd.Series(np.isfinite(f) & (f % 1 == 0), index=v.index)
+
+
+def is_float_series(s):
+    """ Vectorized is_float: True where the value is a number (inf included), False on missing values
+    Args:
+        s:   pd.Series or array-like
+    Returns:
+        pd.Series of bool
+    """
+    v, f = _to_numeric_series(s)
+    return pd.Series(~np.isnan(f), index=v.index)
+
 
 
 ########################################################################################################
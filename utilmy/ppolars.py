@@ -129,17 +129,8 @@ def pl_to_file(df, filei,  check=0, verbose=True, show='shape',   **kw):
 
 def pd_cartesian(df1, df2) :
   ### Cartesian preoduct
-  import pandas as pd
-  col1 =  list(df1.columns)
-  col2 =  list(df2.columns)
-  df1['xxx'] = 1
-  df2['xxx'] = 1
-  df3 = pd.merge(df1, df2,on='xxx')[ col1 + col2 ]
-  try:
-        del df3['xxx']
-  except:pass
-
-  return df3
+  #### pandas>=1.2: no dummy key column, inputs are not modified
+  return df1.merge(df2, how='cross')
 
 
 def pd_col_bins(df, col, nbins=5):
@@ -189,16 +180,13 @@ def to_datetime(x) :
 
 
 def np_list_intersection(l1, l2) :
-  return [x for x in l1 if x in l2]
+  s2 = set(l2)   #### O(1) lookup, keeps l1 order
+  return [x for x in l1 if x in s2]
 
 
 def np_add_remove(set_, to_remove, to_add):
     # a function that removes list of elements and adds an element from a set
-    result_temp = set_.copy()
-    for element in to_remove:
-        result_temp.remove(element)
-    result_temp.add(to_add)
-    return result_temp
+    return (set(set_) - set(to_remove)) | {to_add}
 
 
 def to_float(x):
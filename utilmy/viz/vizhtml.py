@@ -22,17 +22,16 @@ https://datatables.net/
 https://www.highcharts.com/docs/getting-started/how-to-set-options
 
 """
-import os, sys, random, numpy as np, pandas as pd, fire, time
+import os, sys, random, functools, numpy as np, pandas as pd, fire, time
 from datetime import datetime
 from typing import List
-from tqdm import tqdm
 from box import Box
 from utilmy.viz.css import getcss
+from utilmy.ppandas import _colors, _plot_kw_split, _plot_axes_apply, _plot_fast_ok, _plot_series
 from utilmy.viz.test_vizhtml import test1, test2, test3, test4, test_scatter_and_histogram_matplot, test_pd_plot_network, test_page, test_cssname, test_external_css, test_table, test_getdata, test_colimage_table, test_tseries_dateformat 
 
+#### matplotlib / mpld3 are imported in the functions using them: htmlDoc for tables / text does not load them
 try :
-   import matplotlib.pyplot as plt
-   import mpld3
    from highcharts import Highchart
    from pyvis import network as net
 except :
@@ -138,6 +137,24 @@ def show_table_image(df, colgroup= None, colimage = None,title=None,format: str=
    
 #####################################################################################
 #### HTML doc ########################################################################
+_HTML_HR = "\n<hr style=''/>"
+_HTML_BR = "\n<br style=''/>"
+
+#### Page shell shared by all htmlDoc: built once at import, only title / css / js vary per page
+_DOC_HEAD  = sys.intern("<!doctype html>\n<html>\n<head>\n<meta charset='utf-8'>\n")
+_DOC_BODY  = sys.intern("\n </head> \n<body>")
+_DOC_TAIL  = sys.intern("\n </body>\n</html>")
+_DOC_LINKS = sys.intern("""<link href="https://www.highcharts.com/highslide/highslide.css" rel="stylesheet" />
+              <script type="text/javascript" src="https://ajax.googleapis.com/ajax/libs/jquery/1.9.1/jquery.min.js"></script>
+              <script type="text/javascript" src="https://code.highcharts.com/6/highcharts.js"></script>
+              <script type="text/javascript" src="https://code.highcharts.com/6/highcharts-more.js"></script>
+              <script type="text/javascript" src="https://code.highcharts.com/6/modules/heatmap.js"></script>
+              <script type="text/javascript" src="https://code.highcharts.com/6/modules/histogram-bellcurve.js"></script>
+              <script type="text/javascript" src="https://code.highcharts.com/6/modules/exporting.js"></script>
+              <script src="https://d3js.org/d3.v4.js"></script>
+              <script src="https://d3js.org/d3-hexbin.v0.2.min.js"></script>
+              <link href="https://fonts.googleapis.com/css2?family=Arvo&display=swap" rel="stylesheet"> """)
+
 class htmlDoc(object):
     def __init__(self, dir_out="", mode="", title: str = "", format: str = None, cfg: dict = None,
                  css_name: str = "default", css_file: str = None, jscript_file: str = None,
@@ -146,33 +163,20 @@ class htmlDoc(object):
            Generate HTML page to display graph/Table.
            Combine pages together.
         """
-        import mpld3
-
         self.verbose     = verbose
-        self.fig_to_html = mpld3.fig_to_html
+        self.mpld3_loaded = False   #### d3/mpld3 <script> already in the page
         cfg          = {} if cfg is None else cfg
         self.cc      = Box(cfg)  # Config dict
         self.dir_out = dir_out.replace("\\", "/")
-        self.head    = f"  <html>\n<head>\n"
-        self.html    = "\n </head> \n<body>"
-        self.tail    = "\n </body>\n</html>"
+        self.head    = _DOC_HEAD
+        self._chunks = [_DOC_BODY]   #### body parts, joined once on output (no O(N^2) +=)
+        self.tail    = _DOC_TAIL
 
         ##### HighCharts
-        links = """<link href="https://www.highcharts.com/highslide/highslide.css" rel="stylesheet" />
-              <script type="text/javascript" src="https://ajax.googleapis.com/ajax/libs/jquery/1.9.1/jquery.min.js"></script>
-              <script type="text/javascript" src="https://code.highcharts.com/6/highcharts.js"></script>
-              <script type="text/javascript" src="https://code.highcharts.com/6/highcharts-more.js"></script>
-              <script type="text/javascript" src="https://code.highcharts.com/6/modules/heatmap.js"></script>
-              <script type="text/javascript" src="https://code.highcharts.com/6/modules/histogram-bellcurve.js"></script>
-              <script type="text/javascript" src="https://code.highcharts.com/6/modules/exporting.js"></script>
-              <script src="https://d3js.org/d3.v4.js"></script>
-              <script src="https://d3js.org/d3-hexbin.v0.2.min.js"></script>
-              <link href="https://fonts.googleapis.com/css2?family=Arvo&display=swap" rel="stylesheet"> """
-        
+        links = _DOC_LINKS
         links = links + f'\n<link rel="stylesheet" href="{css_file}">' if css_file else links
-      
-        self.head = self.head + """<title>{title}</title>
-              {links}""".format(title=title,links=links)
+
+        self.head = self.head + f"<title>{title}</title>\n              " + links
          
         self.tail = f"\n<script src='{jscript_file}'></script>\n" + self.tail if jscript_file else self.tail
 
@@ -180,19 +184,48 @@ class htmlDoc(object):
         # self.add_css(css_get_template(css_name=css_name))
 
         if css_name=="a4":
-          self.html = self.html + '\n <page size="A4">'
+          self._emit('\n <page size="A4">')
           self.tail = "</page> \n" + self.tail
 
-    def tag(self, x):  self.html += "\n" + x
-    def h1(self,  x,css: str='')  : self.html += "\n" + f"<h1 style='{css}'>{x}</h1>"
-    def h2(self,  x,css: str='')  : self.html += "\n" + f"<h2 style='{css}'>{x}</h2>"
-    def h3(self,  x,css: str='')  : self.html += "\n" + f"<h3 style='{css}'>{x}</h3>"
-    def h4(self,  x,css: str='')  : self.html += "\n" + f"<h4 style='{css}'>{x}</h4>"
-    def p(self,   x,css: str='')  : self.html += "\n" + f"<p style='{css}'>{x}</p>"
-    def div(self, x,css: str='')  : self.html += "\n" + f"<div style='{css}'>{x}</div>"
-    def hr(self,    css: str='')  : self.html += "\n" + f"<hr style='{css}'/>"
-    def sep(self,   css: str='')  : self.html += "\n" + f"<hr style='{css}'/>"
-    def br(self,    css: str='')  : self.html += "\n" + f"<br style='{css}'/>"
+    def _emit(self, *parts):  self._chunks.extend(parts)   #### pre-split literals, no per-call f-string
+
+    def tag(self, x):  self._emit("\n", x)
+    def h1(self,  x,css: str='')  : self._emit("\n<h1 style='",  css, "'>", str(x), "</h1>")
+    def h2(self,  x,css: str='')  : self._emit("\n<h2 style='",  css, "'>", str(x), "</h2>")
+    def h3(self,  x,css: str='')  : self._emit("\n<h3 style='",  css, "'>", str(x), "</h3>")
+    def h4(self,  x,css: str='')  : self._emit("\n<h4 style='",  css, "'>", str(x), "</h4>")
+    def p(self,   x,css: str='')  : self._emit("\n<p style='",   css, "'>", str(x), "</p>")
+    def div(self, x,css: str='')  : self._emit("\n<div style='", css, "'>", str(x), "</div>")
+    def hr(self,    css: str='')  : self._emit( "\n<hr style='" + css + "'/>" if css else _HTML_HR)
+    def sep(self,   css: str='')  : self._emit( "\n<hr style='" + css + "'/>" if css else _HTML_HR)
+    def br(self,    css: str='')  : self._emit( "\n<br style='" + css + "'/>" if css else _HTML_BR)
+
+    def fig_to_html(self, fig)-> str:
+        """ mpld3 figure to html: d3/mpld3 js from CDN, script tags only with the first figure of the page.
+            Override with cfg['html_opts'] (mpld3.fig_to_html arguments).
+        """
+        import mpld3
+        return mpld3.fig_to_html(fig, **self.mpld3_html_opts())
+
+    def mpld3_html_opts(self)-> dict:
+        import mpld3
+        opts = {'d3_url': mpld3.urls.D3_URL, 'mpld3_url': mpld3.urls.MPLD3MIN_URL, 'template_type': 'simple',
+                'include_libraries': not self.mpld3_loaded,
+                **self.cc.get('html_opts', {}) }
+        return opts
+
+    def _emit_plot(self, mode: str, html_code: str):
+        self._emit("\n\n", html_code)
+        #### d3/mpld3 scripts count as loaded only once a figure carrying them is in the page
+        if mode in _MPLD3_MODES and html_code:  self.mpld3_loaded = True
+
+    @property
+    def html(self)-> str:
+        return "".join(self._chunks)
+
+    @html.setter
+    def html(self, x: str):
+        self._chunks = [x]
 
     def get_html(self)-> str:
         full = self.head  + self.html + self.tail
@@ -204,18 +237,23 @@ class htmlDoc(object):
 
     def save(self, dir_out=None):
         self.dir_out = dir_out if dir_out is not None else self.dir_out
-        self.dir_out = dir_out.replace("\\", "/")
+        self.dir_out = self.dir_out.replace("\\", "/")
         self.dir_out = os.getcwd() + "/" + self.dir_out if "/" not in self.dir_out[0] else self.dir_out
         os.makedirs( os.path.dirname(self.dir_out) , exist_ok = True )
 
-        full = self.head + self.html + self.tail
-        with open(self.dir_out, mode='w') as fp:
-            fp.write(full)
+        #### write chunk by chunk: the full document is never built as one string
+        with open(self.dir_out, mode='w', encoding='utf-8', buffering=1 << 20) as fp:
+            fp.write(self.head)
+            fp.writelines(self._chunks)
+            fp.write(self.tail)
 
-    def open_browser(self):
-        if os.name == 'nt':
-            os.system(f'start chrome "file:///{self.dir_out}" ')
-            ### file:///D:/_devs/Python01/gitdev/myutil/utilmy/viz/test_viz_table.html   
+    def open_browser(self, force: bool=False):
+        #### default browser, no shell: file:///D:/_devs/Python01/gitdev/myutil/utilmy/viz/test_viz_table.html
+        #### Windows only by default (headless / CI runs), force=True on other OS
+        if os.name == 'nt' or force:
+            import webbrowser
+            from pathlib import Path
+            webbrowser.open_new_tab(Path(os.path.abspath(self.dir_out)).as_uri())
 
     def add_css(self, css):
         data = f"\n<style>\n{css}\n</style>\n"
@@ -229,9 +267,9 @@ class htmlDoc(object):
         # Hidden P paragraph
         custom_id = str(random.randint(9999,999999))
         # self.head += "\n" + js_code.js_hidden  # Hidden  javascript
-        self.html += "\n" + f"<div id='div{custom_id}' style='{css}'>{x}</div>"
+        self._emit("\n<div id='div", custom_id, "' style='", css, "'>", str(x), "</div>")
         button     = """<button id="{btn_id}">Toggle</button>""".format(btn_id="btn"+custom_id)
-        self.html += "\n" + f"{button}"        
+        self._emit("\n", button)
         js         = """function toggle() {{
                 if (document.getElementById("{div_id}").style.visibility === "visible") {{
                   document.getElementById("{div_id}").style.visibility = "hidden"
@@ -286,7 +324,7 @@ class htmlDoc(object):
             html_code = html_code.replace('&lt;','<')
             html_code = html_code.replace('&gt;','>')
             html_code = html_code.replace('width: auto"></td>','width: auto">&nbsp;</td>')
-        self.html += "\n\n" + html_code
+        self._emit("\n\n", html_code)
 
 
     def plot_tseries(self, df:pd.DataFrame, coldate, coly1: list, coly2=[],
@@ -304,26 +342,15 @@ class htmlDoc(object):
             ...
             mode:       matplot or highcharts
         """
-        html_code = ''
-        if mode == 'matplot':
-            fig       = pd_plot_tseries_matplot(df, coldate, coly1=coly1, coly2=coly2,
-                                                   date_format=date_format,
-
-                                                   title=title, xlabel=xlabel, y1label=y1label, y2label=y2label,
-                                                   figsize=figsize,  spacing=spacing,
+        backend   = _TSERIES_BACKENDS.get(mode, _backend_none)
+        html_code = backend(self, df, coldate, coly1=coly1, coly2=coly2,
+                            date_format=date_format,
 
-                                                   cfg=cfg, mode=mode, save_img=save_img, verbose=self.verbose )
-            html_code = mpld3.fig_to_html(fig)
+                            title=title, xlabel=xlabel, y1label=y1label, y2label=y2label,
+                            figsize=figsize,  spacing=spacing,
 
-        elif mode == 'highcharts':
-            html_code = pd_plot_tseries_highcharts(df, coldate, coly1=coly1, coly2=coly2,
-                                                   date_format=date_format,
-
-                                                   title=title, xlabel=xlabel, y1label=y1label, y2label=y2label,
-                                                   figsize=figsize,  spacing=spacing,
-
-                                                   cfg=cfg, mode=mode, save_img=save_img, verbose=self.verbose  )
-        self.html += "\n\n" + html_code
+                            cfg=cfg, mode=mode, save_img=save_img, verbose=self.verbose )
+        self._emit_plot(mode, html_code)
 
 
     def plot_histogram(self, df:pd.DataFrame, col,
@@ -339,23 +366,13 @@ class htmlDoc(object):
             ...
             mode:       matplot or highcharts
         """
-        html_code = ''
-        if mode == 'matplot':
-            fig       = pd_plot_histogram_matplot(df, col,
-                                                  title=title, xlabel= xlabel, ylabel=ylabel,
-                                                  colormap=colormap, nsample=nsample,
-                                                  nbin=nbin, q5=q5, q95=q95,
-                                                  cfg=cfg, mode=mode, save_img=save_img, verbose=self.verbose  )
-            html_code = self.fig_to_html(fig)
-
-        elif mode == 'highcharts':
-            cfg['figsize'] = figsize
-            html_code = pd_plot_histogram_highcharts(df, col,
-                                                     title=title, xaxis_label=xlabel, yaxis_label=ylabel,
-                                                     colormap=colormap, nsample=nsample,
-                                                     binsNumber=nbin,binWidth=binWidth,color=color,
-                                                     cfg=cfg,mode=mode,save_img=save_img, verbose=self.verbose  )
-        self.html += "\n\n" + html_code
+        backend   = _HISTOGRAM_BACKENDS.get(mode, _backend_none)
+        html_code = backend(self, df, col,
+                            title=title, xlabel= xlabel, ylabel=ylabel,
+                            figsize=figsize, colormap=colormap, nsample=nsample,
+                            nbin=nbin, q5=q5, q95=q95, binWidth=binWidth, color=color,
+                            cfg=cfg, mode=mode, save_img=save_img, verbose=self.verbose  )
+        self._emit_plot(mode, html_code)
 
 
     def plot_scatter(self, df:pd.DataFrame, colx, coly,
@@ -370,24 +387,20 @@ class htmlDoc(object):
             colx:       x Axis
             coly:       y Axis
             ...
-            mode:       matplot or highcharts
+            mode:       matplot, highcharts, plotly (webgl), datashader (png, for >100k points)
+                        or auto: pick by number of points
         """
-        html_code = ''
-        if mode == 'matplot':
-            html_code = pd_plot_scatter_matplot(df, colx=colx, coly=coly,
-                                                collabel=collabel,
-                                                colclass1=colclass1, colclass2=colclass2, colclass3=colclass3,
-                                                nsample=nsample,
-                                                cfg=cfg, mode=mode, save_img=save_img, verbose= self.verbose )
-
-        elif mode == 'highcharts':
-            html_code = pd_plot_scatter_highcharts(df, colx= colx, coly=coly,
-                                                   collabel=collabel,
-                                                   colclass1=colclass1, colclass2=colclass2, colclass3=colclass3,
-                                                   nsample=nsample,
-                                                   cfg=cfg, mode=mode, save_img=save_img, verbose=self.verbose )
-
-        self.html += "\n\n" + html_code
+        if mode == 'auto':   #### SVG (mpld3) is slow past a few 1000 points: webgl, then raster
+            mode = 'matplot' if len(df) < 5000 else 'plotly' if len(df) < 100000 else 'datashader'
+
+        backend   = _SCATTER_BACKENDS.get(mode, _backend_none)
+        html_code = backend(self, df, colx=colx, coly=coly,
+                            collabel=collabel,
+                            colclass1=colclass1, colclass2=colclass2, colclass3=colclass3,
+                            nsample=nsample,
+                            cfg=cfg, mode=mode, save_img=save_img, verbose= self.verbose )
+
+        self._emit_plot(mode, html_code)
       
     def plot_density(self, df: pd.DataFrame, colx, coly, radius=9,
                      title: str = 'Plot Density',
@@ -405,7 +418,7 @@ class htmlDoc(object):
         html_code = ''
         if mode == 'd3':
             html_code = pd_plot_density_d3(df, colx, coly, radius, title, figsize, xlabel, ylabel, color, cfg)
-        self.html += "\n\n" + html_code 
+        self._emit("\n\n", html_code)
       
     def plot_parallel(self, df: pd.DataFrame, col=[],
                     title: str = '',
@@ -422,22 +435,67 @@ class htmlDoc(object):
       html_code = ''
       if mode == 'd3':
          html_code = pd_plot_parallel_d3(df, col, title, figsize, color, cfg)
-      self.html += "\n\n" + html_code  
+      self._emit("\n\n", html_code)
 
       
     def images_dir(self, dir_input="*.png",  title: str="", 
                    verbose:bool =False):
       html_code = images_to_html(dir_input=dir_input,  title=title, verbose=verbose)
-      self.html += "\n\n" + html_code
+      self._emit("\n\n", html_code)
 
 
     def pd_plot_network(self, df:pd.DataFrame, cola:    str='col_node1', colweight:str="weight",
                         colb: str='col_node2', coledge: str='col_edge'):
         head, body = pd_plot_network(df, cola=cola, colb=colb,colweight=colweight, coledge=coledge)
-        self.html += "\n\n" + body
+        self._emit("\n\n", body)
         self.head += "\n\n" + head 
 
 
+#### Plot backends by mode: (doc, df, ...) -> html code. Names resolve at call time.
+def _backend_none(doc, df, *args, **kw)-> str:
+    return ''
+
+def _scatter_matplot(doc, df, cfg: dict = {}, **kw)-> str:
+    return pd_plot_scatter_matplot(df, cfg={**cfg, 'html_opts': doc.mpld3_html_opts()}, **kw)
+
+def _fig_to_html_close(doc, fig)-> str:
+    #### figure is only needed for its html: close it, pyplot keeps every figure alive until closed
+    import matplotlib.pyplot as plt
+    fig       = getattr(fig, 'figure', fig)   ### plot helpers may return an Axes
+    html_code = doc.fig_to_html(fig)
+    plt.close(fig)
+    return html_code
+
+def _tseries_matplot(doc, df, coldate, **kw)-> str:
+    return _fig_to_html_close(doc, pd_plot_tseries_matplot(df, coldate, **kw))
+
+def _histogram_matplot(doc, df, col, **kw)-> str:
+    return _fig_to_html_close(doc, pd_plot_histogram_matplot(df, col, **kw))
+
+def _histogram_highcharts(doc, df, col, xlabel=None, ylabel=None, nbin=10, figsize=None, cfg: dict = {}, **kw)-> str:
+    return pd_plot_histogram_highcharts(df, col, xaxis_label=xlabel, yaxis_label=ylabel, binsNumber=nbin,
+                                        cfg={**cfg, 'figsize': figsize}, **kw)
+
+_MPLD3_MODES = ('matplot',)   #### modes rendered by mpld3, share the page d3/mpld3 scripts
+
+_SCATTER_BACKENDS = {
+    'matplot':    _scatter_matplot,
+    'highcharts': lambda doc, df, **kw: pd_plot_scatter_highcharts(df, **kw),
+    'plotly':     lambda doc, df, **kw: pd_plot_scatter_plotly(df, **kw),
+    'datashader': lambda doc, df, **kw: pd_plot_scatter_datashader(df, **kw),
+}
+
+_TSERIES_BACKENDS = {
+    'matplot':    _tseries_matplot,
+    'highcharts': lambda doc, df, coldate, **kw: pd_plot_tseries_highcharts(df, coldate, **kw),
+}
+
+_HISTOGRAM_BACKENDS = {
+    'matplot':    _histogram_matplot,
+    'highcharts': _histogram_highcharts,
+}
+
+
 
 ##################################################################################################################
 ######### MLPD3 Display ##########################################################################################
@@ -450,43 +508,53 @@ mpld3_CSS = """
 """
 
 
-class mpld3_TopToolbar(mpld3.plugins.PluginBase):
-    """Plugin for moving toolbar to top of figure"""
-
-    JAVASCRIPT = """
-    mpld3.register_plugin("toptoolbar", TopToolbar);
-    TopToolbar.prototype = Object.create(mpld3.Plugin.prototype);
-    TopToolbar.prototype.constructor = TopToolbar;
-    function TopToolbar(fig, props){
-        mpld3.Plugin.call(this, fig, props);
-    };
-    TopToolbar.prototype.draw = function(){
-      // the toolbar svg doesn't exist
-      // yet, so first draw it
-      this.fig.toolbar.draw();
-      // then change the y position to be
-      // at the top of the figure
-      this.fig.toolbar.toolbar.attr("x", 150);
-      this.fig.toolbar.toolbar.attr("y", 400);
-      // then remove the draw function,
-      // so that it is not called again
-      this.fig.toolbar.draw = function() {}
-    }
+@functools.lru_cache(maxsize=1)
+def _build_toolbar():
+    """ mpld3 plugin class, created on first use only (mpld3 is imported lazily).
+        usage:  mpld3.plugins.connect(fig, tooltip, _build_toolbar()())
     """
-    def __init__(self):
-        self.dict_ = {"type": "toptoolbar"}
+    import mpld3
+
+    class mpld3_TopToolbar(mpld3.plugins.PluginBase):
+        """Plugin for moving toolbar to top of figure"""
+
+        JAVASCRIPT = """
+        mpld3.register_plugin("toptoolbar", TopToolbar);
+        TopToolbar.prototype = Object.create(mpld3.Plugin.prototype);
+        TopToolbar.prototype.constructor = TopToolbar;
+        function TopToolbar(fig, props){
+            mpld3.Plugin.call(this, fig, props);
+        };
+        TopToolbar.prototype.draw = function(){
+          // the toolbar svg doesn't exist
+          // yet, so first draw it
+          this.fig.toolbar.draw();
+          // then change the y position to be
+          // at the top of the figure
+          this.fig.toolbar.toolbar.attr("x", 150);
+          this.fig.toolbar.toolbar.attr("y", 400);
+          // then remove the draw function,
+          // so that it is not called again
+          this.fig.toolbar.draw = function() {}
+        }
+        """
+        def __init__(self):
+            self.dict_ = {"type": "toptoolbar"}
+
+    return mpld3_TopToolbar
 
 
 def mlpd3_add_tooltip(fig, points, labels):
+    import mpld3
     # set tooltip using points, labels and the already defined 'css'
     tooltip = mpld3.plugins.PointHTMLTooltip(
         points[0], labels, voffset=10, hoffset=10, css=mpld3_CSS)
     # connect tooltip to fig
-    mpld3.plugins.connect(fig, tooltip, mpld3_TopToolbar())
+    mpld3.plugins.connect(fig, tooltip, _build_toolbar()())
 
 
 def pd_plot_scatter_get_data(df0:pd.DataFrame,colx: str=None, coly: str=None, collabel: str=None,
-                            colclass1: str=None, colclass2: str=None, nmax: int=20000, **kw):
+                            colclass1: str=None, colclass2: str=None, nmax: int=20000, ndigit: int=4, **kw):
     # import copy
     nmax = min(nmax, len(df0))
     df   = df0.sample(nmax)
@@ -503,24 +571,30 @@ def pd_plot_scatter_get_data(df0:pd.DataFrame,colx: str=None, coly: str=None, co
        df[ci]  = df[ci].fillna('')
 
     #######################################################################################
-    xx = df[colx].values
-    yy = df[coly].values
+    #### x, y are serialized as JSON floats in the html: rounded, they print with a few digits only
+    xx = np.round(df[colx].to_numpy(dtype=np.float64), ndigit)
+    yy = np.round(df[coly].to_numpy(dtype=np.float64), ndigit)
 
     # label_list = df[collabel].values
-    label_list = ['{collabel} : {value}'.format(collabel=collabel,value =  df0[collabel][i]) for i in range(len(df0[collabel]))]
+    #### from the sampled df (same order as xx, yy), iterate the ndarray: no per row Series indexing
+    label_list = [ f'{collabel} : {value}' for value in df[collabel].values ]
+
+    #### hash once per distinct class value, then broadcast to the points by their class code
+    def class_to_scheme(values, scheme):
+        codes, uniques = pd.factorize(values)
+        idx = np.array([ hash(str(x)) % len(scheme) for x in uniques ], dtype=np.int64)
+        return np.asarray(scheme)[idx][codes]
 
     ### Using Class 1 ---> Color
     color_scheme = [ 0,1,2,3]
-    n_colors     = len(color_scheme)
-    color_list   = [  color_scheme[ hash(str( x)) % n_colors ] for x in df[colclass1].values     ]
+    color_list   = class_to_scheme(df[colclass1].values, color_scheme)
 
 
-    ### Using Class 2  ---> Color
+    ### Using Class 2  ---> Size
     n_size      = len(df[colclass2].unique())
     smin, smax  = 100.0, 200.0
-    size_scheme = np.arange(smin, smax, (smax-smin)/n_size)
-    n_colors    = len(size_scheme)
-    size_list   = [  size_scheme[ hash(str( x)) % n_colors ] for x in df[colclass2].values     ]
+    size_scheme = np.round(np.arange(smin, smax, (smax-smin)/n_size), 1)
+    size_list   = class_to_scheme(df[colclass2].values, size_scheme)
 
 
     ###
@@ -533,10 +607,13 @@ def pd_plot_scatter_get_data(df0:pd.DataFrame,colx: str=None, coly: str=None, co
 def pd_plot_scatter_matplot(df:pd.DataFrame, colx: str=None, coly: str=None, collabel: str=None,
                             colclass1: str=None, colclass2: str=None,
                             cfg: dict = {}, mode='d3', save_path: str='', verbose=True,  **kw)-> str:
-    
+    import matplotlib.pyplot as plt
+    import mpld3
     cc           = Box(cfg)
     cc.figsize   = cc.get('figsize', (25, 15))  # Dict type default values
     cc.title     = cc.get('title', 'scatter title' )
+    cc.dpi       = cc.get('dpi', 200)  ### 100 for thumbnails: 4x less pixels
+    ts           = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")  ### once per call, unique below the second
 
     #######################################################################################
     xx, yy, label_list, color_list, size_list, ptype_list = pd_plot_scatter_get_data(df,colx, coly, collabel,
@@ -557,14 +634,14 @@ def pd_plot_scatter_matplot(df:pd.DataFrame, colx: str=None, coly: str=None, col
     ax.set_aspect('auto')
     ax.tick_params(axis='x',        # changes apply to the x-axis
                    which='both',    # both major and minor ticks are affected
-                   bottom='off',    # ticks along the bottom edge are off
-                   top='off',       # ticks along the top edge are off
-                   labelbottom='off')
+                   bottom=False,    # ticks along the bottom edge are off
+                   top=False,       # ticks along the top edge are off
+                   labelbottom=False)
     ax.tick_params(axis='y',  # changes apply to the y-axis
                    which='both',  # both major and minor ticks are affected
-                   left='off',  # ticks along the bottom edge are off
-                   top='off',  # ticks along the top edge are off
-                   labelleft='off')
+                   left=False,  # ticks along the bottom edge are off
+                   top=False,  # ticks along the top edge are off
+                   labelleft=False)
 
     # ax.legend(numpoints=1)  # show legend with only 1 point
     # label_list = ['{0}'.format(d_small['Name'][i]) for i in range(N)]
@@ -573,10 +650,8 @@ def pd_plot_scatter_matplot(df:pd.DataFrame, colx: str=None, coly: str=None, col
     #     ax.text(df['Age'][i], df['Fare'][i], label_list[i], size=8)
     
     if len(save_path) > 1 :
-        plt.savefig(f'{cc.save_path}-{datetime.now().strftime("%Y-%m-%d %H-%M-%S")}.png', dpi=200)
+        plt.savefig(f'{save_path}-{ts}.png', dpi=cc.dpi)
 
-    
-    ax.set_aspect('auto')
 
     #  uncomment to hide tick
     # set tick marks as blank
@@ -589,7 +664,7 @@ def pd_plot_scatter_matplot(df:pd.DataFrame, colx: str=None, coly: str=None, col
     
     # connect tooltip to fig
     tooltip = mpld3.plugins.PointLabelTooltip(scatter, labels=label_list, voffset=10, hoffset=10)
-    mpld3.plugins.connect(fig, tooltip, mpld3_TopToolbar())
+    mpld3.plugins.connect(fig, tooltip, _build_toolbar()())
     # mlpd3_add_tooltip(fig, points, label_list)
     
 
@@ -597,7 +672,8 @@ def pd_plot_scatter_matplot(df:pd.DataFrame, colx: str=None, coly: str=None, col
     # mpld3.save_html(fig,  f"okembeds.html")
     # return fig
     ##### Export ############################################################
-    html_code = mpld3.fig_to_html(fig)
+    html_code = mpld3.fig_to_html(fig, **cc.get('html_opts', {}))
+    plt.close(fig)   #### pyplot keeps every figure alive until closed
     # print(html_code)
     return html_code
    
@@ -850,21 +926,19 @@ def pd_plot_histogram_matplot(df:pd.DataFrame, col: str='' ,colormap:str='RdYlBu
     ax.set_ylim(config['ylim'])
     return fig
     """
+    import matplotlib.pyplot as plt
     cm = plt.cm.get_cmap(colormap)
     df.loc[:,col] = df[col].fillna(0)
     df.loc[:,col] = [ to_float(t) for t in df[col].values  ]
-    dfi = df[col]
-    q0  = dfi.quantile(q5)
-    q1  = dfi.quantile(q95)
+    arr    = df[col].to_numpy(dtype=float)
+    q0, q1 = np.percentile(arr, [q5 * 100, q95 * 100])
+    bins   = np.linspace(q0, q1, int(nbin) + 1)
 
     fig = plt.figure()
 
-    if nsample < 0:
-        n, bins, patches = plt.hist(dfi, bins=np.arange(q0, q1,  (q1 - q0) / nbin))
-        # dfi.hist(bins=np.arange(q0, q1,  (q1 - q0) / nbin))
-    else:
-        n, bins, patches = plt.hist(dfi.sample(n=nsample, replace=True), bins=np.arange(q0, q1,  (q1 - q0) / nbin))
-        # dfi.sample(n=nsample, replace=True).hist( bins=np.arange(q0, q1,  (q1 - q0) / nbin))
+    if nsample > 0:
+        arr = np.random.default_rng().choice(arr, size=nsample, replace=True)
+    n, bins, patches = plt.hist(arr, bins=bins)
     for i, p in enumerate(patches):
         plt.setp(p, 'facecolor', cm(i/nbin))
     plt.title(title)
@@ -885,8 +959,6 @@ def pd_plot_tseries_matplot(df:pd.DataFrame, plot_type: str=None, coly1: list =
                             figsize: tuple =(8, 4), spacing=0.1, verbose=True, **kw):
     """
     """
-    from pandas import plotting
-    from pandas.plotting import _matplotlib
     from matplotlib import pyplot as plt
 
     plt.figure(figsize=figsize)
@@ -895,45 +967,48 @@ def pd_plot_tseries_matplot(df:pd.DataFrame, plot_type: str=None, coly1: list =
         coly1 = df.columns
     if len(coly1) == 0:
         return
-    colors = getattr(getattr(plotting, '_matplotlib').style, '_get_standard_colors')(
-        num_colors=len(coly1 + coly2))
+    colors = _colors(len(coly1) + len(coly2))
 
     # Displays subplot's pair in case of plot_type defined as `pair`
     if plot_type == 'pair':
         ax = df.plot(subplots=True, figsize=figsize, **kw)
         # plt.show()
+        import mpld3
         html_code = mpld3.fig_to_html(ax,  **kw)
         return html_code
 
     # First axis
-    ax = df.loc[:, coly1[0]].plot(
-        label=coly1[0], color=colors[0], **kw)
+    #### pandas .plot() arguments: line ones to Axes.plot, others on the axes. htmlDoc level ones are dropped
+    linekw, axkw = _plot_kw_split(kw, drop=('cfg', 'mode', 'save_img', 'date_format', 'y1label', 'y2label'))
+    fast   = _plot_fast_ok(df.index, linekw)
+    ax     = plt.gca()
+    _plot_series(ax, df, coly1[0], colors[0], fast, linekw, axkw)
     ax.set_ylabel(ylabel=coly1[0])
-    ##  lines, labels = ax.get_legend_handles_labels()
-    lines, labels = [], []
 
     i1 = len(coly1)
     for n in range(1, len(coly1)):
-        df.loc[:, coly1[n]].plot(
-            ax=ax, label=coly1[n], color=colors[(n) % len(colors)], **kw)
-        line, label = ax.get_legend_handles_labels()
-        lines += line
-        labels += label
-
-    for n in range(0, len(coly2)):
-        # Multiple y-axes
-        ax_new = ax.twinx()
+        _plot_series(ax, df, coly1[n], colors[(n) % len(colors)], fast, linekw, axkw)
+
+    # Multiple y-axes: all created and positioned first, then filled
+    twins = [ax.twinx() for _ in coly2]
+    for n, ax_new in enumerate(twins):
         ax_new.spines['right'].set_position(('axes', 1 + spacing * (n - 1)))
-        df.loc[:, coly2[n]].plot(
-            ax=ax_new, label=coly2[n], color=colors[(i1 + n) % len(colors)], **kw)
+
+    for n, ax_new in enumerate(twins):
+        _plot_series(ax_new, df, coly2[n], colors[(i1 + n) % len(colors)], fast, linekw, axkw)
         ax_new.set_ylabel(ylabel=coly2[n])
 
-        # Proper legend position
-        line, label = ax_new.get_legend_handles_labels()
-        lines += line
-        labels += label
+    if fast : _plot_axes_apply([ax] + twins, axkw)   # pandas .plot() already applied them otherwise
+
+    # Proper legend position: collect handles once, after all plots
+    lines, labels = [], []
+    for axi in [ax] + twins:
+        line, label = axi.get_legend_handles_labels()
+        lines.extend(line)
+        labels.extend(label)
 
-    ax.legend(lines, labels, loc=0)
+    if axkw.get('legend', True) is not False:
+        ax.legend(lines, labels, loc=0)
     #plt.show()
     return ax
     # html_code = mpld3.fig_to_html(ax,  **kw)
@@ -944,6 +1019,7 @@ def mpld3_server_start():
     # Windows specifc
     # if os.name == 'nt': os.system(f'start chrome "{dir_out}/embeds.html" ')
     # mpld3.show(fig=None, ip='127.0.0.1', port=8888, n_retries=50, local=True, open_browser=True, http_server=None, **kwargs)[source]
+    import mpld3
     mpld3.show()  # show the plot
 
 
@@ -984,6 +1060,7 @@ def pd_plot_scatter_highcharts(df0:pd.DataFrame, colx:str=None, coly:str=None, c
                                cfg:dict={}, mode='d3', save_img=False,  verbose=True )
     """
     import matplotlib
+    import matplotlib.pyplot as plt
     from box import Box
     from highcharts import Highchart
 
@@ -1024,7 +1101,7 @@ def pd_plot_scatter_highcharts(df0:pd.DataFrame, colx:str=None, coly:str=None, c
     ### Using Class 2  ---> Color
     n_size      = len(df[colclass2].unique())
     smin, smax  = 1.0, 15.0
-    size_scheme = np.arange(smin, smax, (smax-smin)/n_size)
+    size_scheme = np.round(np.arange(smin, smax, (smax-smin)/n_size), 1)
     n_colors    = len(size_scheme)
     size_list   = [  size_scheme[ hash(str( x)) % n_colors ] for x in df[colclass2].values     ]
 
@@ -1057,6 +1134,84 @@ def pd_plot_scatter_highcharts(df0:pd.DataFrame, colx:str=None, coly:str=None, c
     return html_code
 
 
+def pd_plot_scatter_plotly(df0:pd.DataFrame, colx:str=None, coly:str=None, collabel: str=None,
+                           colclass1: str=None, colclass2: str=None, nsample=10000,
+                           cfg:dict={}, mode='plotly', save_img='', verbose=True, **kw)-> str:
+    """ Plot Plotly X=Y Scatter, WebGL rendering (canvas, no SVG node per point)
+    from utilmy.viz import vizhtml
+    vizhtml.pd_plot_scatter_plotly(df, colx:str=None, coly:str=None, collabel=None,
+                               colclass1=None, colclass2=None, nsample=10000,
+                               cfg:dict={}, mode='plotly', save_img=False,  verbose=True )
+    colclass2 values (numeric or not) map to marker sizes by class, bounded by cfg size_min / size_max (px).
+    """
+    import plotly.express as px
+    from box import Box
+
+    cc = Box(cfg)
+    cc.title      = cc.get('title',    'my scatter')
+    cc.figsize    = cc.get('figsize', (640, 480) )   ### Dict type default values
+    if verbose: print(cc['title'], cc['figsize'])
+
+    nsample = min(nsample, len(df0))
+    df   = df0.sample(nsample)
+
+    colx      = 'x'      if colx is None else colx
+    coly      = 'y'      if coly is None else coly
+    collabel  = 'label'  if collabel is None else collabel    ### label per point
+    colclass1 = 'class1' if colclass1 is None else colclass1  ### Color per point class1
+    colclass2 = 'class2' if colclass2 is None else colclass2  ### Size per point class2, if numeric
+
+    #######################################################################################
+    ### numpy arrays, not Series: plotly serializes them as typed arrays
+    color_list = df[colclass1].astype(str).values if colclass1 in df.columns else None
+    size_list  = None
+    if colclass2 in df.columns :
+        ### Class 2 ---> Size: one positive size per distinct class, as in pd_plot_scatter_get_data
+        codes, uniques = pd.factorize(df[colclass2])   ### NaN class gets code -1 --> smallest size
+        size_list = 1.0 + np.maximum(codes, 0) * 9.0 / max(len(uniques) - 1, 1)
+    label_list = df[collabel].astype(str).values  if collabel  in df.columns else None
+
+    fig = px.scatter(x=df[colx].values, y=df[coly].values, color=color_list, size=size_list, hover_name=label_list,
+                     labels={'x': colx, 'y': coly}, title=cc.title,
+                     width=cc.figsize[0], height=cc.figsize[1], render_mode='webgl',
+                     size_max=cc.get('size_max', 12))
+    if size_list is not None : fig.update_traces(marker_sizemin=cc.get('size_min', 3))
+    html_code = fig.to_html(include_plotlyjs='cdn', full_html=False)
+    return html_code
+
+
+def pd_plot_scatter_datashader(df:pd.DataFrame, colx:str=None, coly:str=None,
+                               cfg:dict={}, mode='datashader', save_img='', verbose=True, **kw)-> str:
+    """ Plot Datashader X=Y Scatter: all points rasterized to one png, embedded as <img>
+    For very large data (>100k points), where any per point html is too heavy.
+    from utilmy.viz import vizhtml
+    vizhtml.pd_plot_scatter_datashader(df, colx:str=None, coly:str=None, cfg:dict={})
+    """
+    import base64, io
+    import datashader as ds
+    from box import Box
+
+    cc = Box(cfg)
+    cc.title      = cc.get('title',    'my scatter')
+    cc.figsize    = cc.get('figsize', (640, 480) )   ### Dict type default values
+    cc.colormap   = cc.get('colormap', ['lightblue', 'darkblue'])
+    if verbose: print(cc['title'], cc['figsize'])
+
+    colx      = 'x'      if colx is None else colx
+    coly      = 'y'      if coly is None else coly
+
+    canvas = ds.Canvas(plot_width=int(cc.figsize[0]), plot_height=int(cc.figsize[1]))
+    agg    = canvas.points(df, colx, coly)
+    img    = ds.transfer_functions.shade(agg, cmap=cc.colormap, how='eq_hist').to_pil()
+
+    buf = io.BytesIO()
+    img.save(buf, format='png')
+    if isinstance(save_img, str) and len(save_img) > 1 : img.save(save_img)
+    encoded   = base64.b64encode(buf.getvalue()).decode('utf-8')
+    html_code = f"<h3>{cc.title}</h3>\n<p><img src='data:image/png;base64,{encoded}'> </p>\n"
+    return html_code
+
+
 def pd_plot_tseries_highcharts(df0,
                               coldate:str=None, date_format = None,
                               coly1:list =[],     coly2:list =[],
@@ -1279,6 +1434,7 @@ def images_to_html(dir_input="*.png",  title="", verbose=False):
 
 
 def colormap_get_names():
+  import matplotlib.pyplot as plt
   cmaps = {}
   cmaps['uniform_sequential'] = [
             'viridis', 'plasma', 'inferno', 'magma', 'cividis']